@@ -1,9 +1,23 @@
 """Configuration loader."""
 
+import copy
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict
 import yaml
 
+try:  # libyaml-backed loader when PyYAML was built with it
+    from yaml import CSafeLoader as _Loader
+except ImportError:  # pragma: no cover - depends on the PyYAML build
+    from yaml import SafeLoader as _Loader
+
+
+@lru_cache(maxsize=16)
+def _parse_config(path: Path, mtime_ns: int) -> Dict[str, Any]:
+    """Parse a YAML file; memoized on (path, mtime) so edits are picked up."""
+    with path.open("r", encoding="utf-8") as fh:
+        return yaml.load(fh, Loader=_Loader)
+
 
 def load_config(path: str | Path = "config.yaml") -> Dict[str, Any]:
     """Load YAML config file.
@@ -17,5 +31,5 @@ def load_config(path: str | Path = "config.yaml") -> Dict[str, Any]:
     p = Path(path)
     if not p.exists():
         raise FileNotFoundError(f"Config file not found: {p}")
-    with p.open("r", encoding="utf-8") as fh:
-        return yaml.safe_load(fh)
+    # hand out a copy so callers cannot mutate the memoized result
+    return copy.deepcopy(_parse_config(p.resolve(), p.stat().st_mtime_ns))
@@ -1,36 +1,156 @@
-"""Fetch price data and fundamentals from yfinance with validation."""
+"""Fetch price data and fundamentals from yfinance, with an optional disk cache."""
 
-from typing import Dict, Any
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+import json
 import logging
+import time
 import yfinance as yf
+import numpy as np
 import pandas as pd
-from pydantic import ValidationError
-
-from .models import QuarterlyFundamentals, StockDataResponse
 
 logger = logging.getLogger(__name__)
 
+_PRICE_COLUMNS = ["date", "open", "high", "low", "close", "volume"]
+# Bump when the cache file layout changes; old files are then ignored
+_CACHE_VERSION = 1
+
 
 def _frame_to_pricepoints(df: pd.DataFrame) -> pd.DataFrame:
     """Normalize yfinance history DataFrame: ensure columns and types."""
-    df = df.reset_index().rename(
-        columns={
-            "Date": "date",
-            "Open": "open",
-            "High": "high",
-            "Low": "low",
-            "Close": "close",
-            "Volume": "volume",
-        }
-    )
     # Keep only trading days and required cols
-    df = df[["date", "open", "high", "low", "close", "volume"]]
+    df = df.reset_index().rename(columns=str.lower)[_PRICE_COLUMNS]
+    if df["volume"].dtype != "int64":
+        # batch downloads leave NaN volume on other markets' trading days
+        df = df.assign(volume=df["volume"].fillna(0).astype("int64"))
     return df
 
 
-def fetch_stock_data(ticker: str, period: str = "5y") -> Dict[str, Any]:
+def _cache_file(
+    cache_dir: str | Path, ticker: str, period: str, n_quarters: Optional[int] = None
+) -> Path:
+    """Return the on-disk cache location for a (ticker, period) response."""
+    safe_ticker = ticker.replace("/", "_")
+    suffix = f"_q{n_quarters}" if n_quarters is not None else ""
+    return Path(cache_dir) / f"{safe_ticker}_{period}{suffix}.v{_CACHE_VERSION}.json"
+
+
+def _check_n_quarters(n_quarters: Optional[int]) -> None:
+    """Reject quarter counts below 1; None means keep every period."""
+    if n_quarters is not None and n_quarters < 1:
+        raise ValueError(f"n_quarters must be at least 1 or None, got {n_quarters}")
+
+
+def _latest_periods(sheet: Optional[pd.DataFrame], n: Optional[int]) -> pd.DataFrame:
+    """Keep the n most recent period columns of a yfinance balance sheet."""
+    if sheet is None:
+        return pd.DataFrame()
+    if n is None or sheet.shape[1] <= n:
+        return sheet
+    return sheet[sorted(sheet.columns)[-n:]]
+
+
+def _cache_is_fresh(path: Path, ttl_seconds: float) -> bool:
+    """Return True if the cache file exists and is younger than ttl_seconds."""
+    try:
+        age = time.time() - path.stat().st_mtime
+    except FileNotFoundError:
+        return False
+    return age <= ttl_seconds
+
+
+def _json_default(obj: Any) -> Any:
+    """Encode NumPy scalars natively and anything else (e.g. Timestamps) as str."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return str(obj)
+
+
+def _prices_to_json(prices: pd.DataFrame) -> Dict[str, Any]:
+    """Encode a price frame column-wise; dates as UTC epoch ns plus zone and unit."""
+    dates = prices["date"]
+    tz = str(dates.dt.tz) if dates.dt.tz is not None else None
+    utc = dates.dt.tz_convert("UTC") if tz else dates
+    columns = {c: prices[c].tolist() for c in prices.columns if c != "date"}
+    return {
+        "tz": tz,
+        "unit": dates.dt.unit,
+        "date": utc.dt.as_unit("ns").astype("int64").tolist(),
+        "columns": columns,
+    }
+
+
+def _prices_from_json(data: Dict[str, Any]) -> pd.DataFrame:
+    """Inverse of :func:`_prices_to_json`."""
+    dates = pd.to_datetime(data["date"], unit="ns", utc=data["tz"] is not None)
+    if data["tz"] is not None:
+        dates = dates.tz_convert(data["tz"])
+    dates = dates.as_unit(data["unit"])
+    return pd.DataFrame({"date": dates, **data["columns"]})
+
+
+def _read_cache(path: Path, ttl_seconds: float) -> Optional[Dict[str, Any]]:
+    """Load a cached response if it exists and is younger than ttl_seconds."""
+    if not _cache_is_fresh(path, ttl_seconds):
+        return None
+    try:
+        with path.open("r", encoding="utf-8") as fh:
+            payload = json.load(fh)
+        if payload.get("version") != _CACHE_VERSION:
+            return None
+        response_data = payload["response"]
+        response_data["prices"] = _prices_from_json(response_data["prices"])
+        for record in response_data["quarterly_fundamentals"]:
+            record["end_date"] = pd.Timestamp(record["end_date"])
+        return response_data
+    except Exception as e:
+        logger.warning("Ignoring unreadable cache file %s: %s", path, e)
+        return None
+
+
+def _write_cache(path: Path, response_data: Dict[str, Any]) -> None:
+    """Persist a response to the disk cache; failures are logged, not raised.
+
+    The cache is plain JSON, never pickle, so reading a cache directory
+    cannot execute code. The file is written to a temporary name and
+    renamed, so readers never see a partial file.
+    """
+    try:
+        payload = {
+            "version": _CACHE_VERSION,
+            "response": {
+                **response_data,
+                "prices": _prices_to_json(response_data["prices"]),
+            },
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as fh:
+            json.dump(payload, fh, default=_json_default)
+        tmp.replace(path)
+    except Exception as e:
+        logger.warning("Could not write cache file %s: %s", path, e)
+
+
+def fetch_stock_data(
+    ticker: str,
+    period: str = "5y",
+    cache_dir: Optional[str | Path] = None,
+    cache_ttl: float = 3600,
+    prices: Optional[pd.DataFrame] = None,
+    n_quarters: Optional[int] = None,
+) -> Dict[str, Any]:
     """Fetch price history and fundamentals using yfinance.
 
+    When ``cache_dir`` is given, the response is memoized on disk per
+    (ticker, period) and reused for ``cache_ttl`` seconds, so reruns skip
+    the network entirely. ``prices`` may carry history already downloaded
+    by :func:`fetch_price_batches`, in which case only fundamentals are
+    requested. ``n_quarters`` keeps only the most recent balance-sheet
+    periods (all by default, since prices are aligned to every quarter);
+    values below 1 raise ValueError.
+
     Returns dict:
       {
         "ticker": ticker,
@@ -40,16 +160,26 @@ def fetch_stock_data(ticker: str, period: str = "5y") -> Dict[str, Any]:
         "info": dict
       }
     """
+    _check_n_quarters(n_quarters)
+    cache_path = (
+        _cache_file(cache_dir, ticker, period, n_quarters) if cache_dir else None
+    )
+    if cache_path is not None:
+        cached = _read_cache(cache_path, cache_ttl)
+        if cached is not None:
+            logger.info("Using cached data for %s from %s", ticker, cache_path)
+            return cached
+
     logger.info("Fetching data for %s (period=%s)", ticker, period)
     tk = yf.Ticker(ticker)
 
-    # 1) Prices with timeout handling
+    # 1) Prices with timeout handling (skipped when pre-fetched in a batch)
     try:
-        hist = tk.history(period=period, auto_adjust=False, actions=False)
-        if hist.empty:
-            logger.warning("No price history returned for %s", ticker)
-            logger.info("Data quality issue: Empty price history for %s", ticker)
-        prices = _frame_to_pricepoints(hist)
+        if prices is None:
+            hist = tk.history(period=period, auto_adjust=False, actions=False)
+            if hist.empty:
+                logger.warning("Data quality issue: empty price history for %s", ticker)
+            prices = _frame_to_pricepoints(hist)
 
         # Validate price data quality
         if len(prices) < 50:  # Less than 50 days of data
@@ -67,65 +197,161 @@ def fetch_stock_data(ticker: str, period: str = "5y") -> Dict[str, Any]:
         qb = tk.quarterly_balance_sheet  # DataFrame
         if qb is None or qb.empty:
             logger.info(
-                "quarterly_balance_sheet missing; falling back to annual balance_sheet"
-            )
-            logger.info(
-                "Data quality issue: Missing quarterly data for %s, using annual",
+                "Data quality issue: quarterly_balance_sheet missing for %s; "
+                "falling back to annual balance_sheet",
                 ticker,
             )
             ab = tk.balance_sheet
-            qfund_df = ab.transpose() if ab is not None else pd.DataFrame()
+            qfund_df = _latest_periods(ab, n_quarters).transpose()
             source_used = "annual_balance_sheet"
         else:
-            qfund_df = qb.transpose()
+            qfund_df = _latest_periods(qb, n_quarters).transpose()
 
         if qfund_df.empty:
-            logger.warning("No fundamental data available for %s", ticker)
-            logger.info("Data quality issue: No fundamental data for %s", ticker)
+            logger.warning("Data quality issue: no fundamental data for %s", ticker)
 
-    except Exception as e:
-        logger.exception("Error fetching balance sheet: %s", e)
+    except Exception:
+        logger.exception(
+            "Data quality issue: failed to fetch fundamentals for %s", ticker
+        )
         qfund_df = pd.DataFrame()
         source_used = "none_available"
-        logger.info("Data quality issue: Failed to fetch fundamentals for %s", ticker)
 
-    # 3) Info
+    # 3) Info (longName, marketCap and cash fields are all read downstream)
     try:
         info = tk.info or {}
     except Exception:
         info = {}
 
-    # Convert qfund_df to records
-    qfund_df.index.name = "end_date"
-    qfund_records = []
-    for end_dt, row in qfund_df.iterrows():
-        rec = dict(end_date=end_dt, **row.dropna().to_dict())
-        qfund_records.append(rec)
-
-    # Validate a sample with Pydantic where useful (lightweight check)
-    validated_quarters = []
-    for r in qfund_records:
-        try:
-            q = QuarterlyFundamentals(end_date=r.get("end_date"), raw=r)
-            validated_quarters.append(q.dict())
-        except ValidationError as exc:
-            logger.warning("Quarterly fundamentals validation error: %s", exc)
+    # Convert qfund_df to records (one NaN mask for the frame, no per-row Series)
+    by_date = qfund_df.astype(object).where(qfund_df.notna(), None).to_dict("index")
+    qfund_records = [
+        {"end_date": end_dt, **{k: v for k, v in row.items() if v is not None}}
+        for end_dt, row in by_date.items()
+    ]
 
     # Prepare response data
     response_data = {
         "ticker": ticker,
-        "prices": prices.to_dict("records") if not prices.empty else [],
+        "prices": prices,
         "quarterly_fundamentals": qfund_records,
         "info": info,
         "source_used": source_used,
     }
 
-    # Validate response with Pydantic model
-    try:
-        StockDataResponse(**response_data)
-        logger.info("Successfully validated API response for %s", ticker)
-        return response_data
-    except ValidationError as e:
-        logger.warning("Response validation failed for %s: %s", ticker, e)
-        # Return unvalidated data but log the issue
-        return response_data
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Fetched %s: source=%s prices=%d quarters=%d",
+            ticker,
+            source_used,
+            len(prices),
+            len(qfund_records),
+            extra={
+                "ticker": ticker,
+                "source_used": source_used,
+                "n_prices": len(prices),
+                "n_quarters": len(qfund_records),
+            },
+        )
+    if cache_path is not None:
+        _write_cache(cache_path, response_data)
+    return response_data
+
+
+def fetch_price_batches(
+    tickers: List[str], period: str = "5y", batch_size: int = 20
+) -> Dict[str, pd.DataFrame]:
+    """Download price history for many tickers with one request per batch.
+
+    Tickers missing from a batch response are left out of the result so the
+    caller can fall back to a per-ticker history request.
+
+    Args:
+        tickers: Ticker symbols to download.
+        period: yfinance period string (e.g. "5y").
+        batch_size: Maximum number of symbols per yf.download call.
+
+    Returns:
+        Mapping of ticker to normalized price DataFrame.
+    """
+    prices_by_ticker: Dict[str, pd.DataFrame] = {}
+    for i in range(0, len(tickers), batch_size):
+        group = tickers[i : i + batch_size]
+        try:
+            df = yf.download(
+                group,
+                period=period,
+                group_by="ticker",
+                auto_adjust=False,
+                actions=False,
+                threads=True,
+                progress=False,
+            )
+        except Exception as e:
+            logger.warning("Batch price download failed for %s: %s", group, e)
+            continue
+        if df is None or df.empty or not isinstance(df.columns, pd.MultiIndex):
+            continue
+        available = set(df.columns.get_level_values(0))
+        for t in group:
+            if t not in available:
+                continue
+            # rows are the union of all calendars in the batch
+            hist = df[t].dropna(how="all")
+            if not hist.empty:
+                prices_by_ticker[t] = _frame_to_pricepoints(hist)
+    return prices_by_ticker
+
+
+def fetch_many(
+    tickers: List[str],
+    period: str = "5y",
+    cache_dir: Optional[str | Path] = None,
+    cache_ttl: float = 3600,
+    threads: int = 8,
+    batch_size: int = 20,
+    n_quarters: Optional[int] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Fetch several tickers: batched price downloads, threaded fundamentals.
+
+    Tickers with a fresh disk cache are served from it. Prices for the rest
+    are downloaded with :func:`fetch_price_batches`, then fundamentals are
+    fetched per ticker on a thread pool. Failed tickers are logged and left
+    out of the result.
+
+    Returns:
+        Mapping of ticker to the dict returned by :func:`fetch_stock_data`.
+    """
+    _check_n_quarters(n_quarters)
+    if cache_dir:
+        pending = [
+            t
+            for t in tickers
+            if not _cache_is_fresh(
+                _cache_file(cache_dir, t, period, n_quarters), cache_ttl
+            )
+        ]
+    else:
+        pending = list(tickers)
+    prices_by_ticker = fetch_price_batches(pending, period, batch_size)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        futures = {
+            t: ex.submit(
+                fetch_stock_data,
+                t,
+                period,
+                cache_dir,
+                cache_ttl,
+                prices_by_ticker.get(t),
+                n_quarters,
+            )
+            for t in tickers
+        }
+        for t, future in futures.items():
+            try:
+                results[t] = future.result()
+            except Exception:
+                logger.exception("Failed to fetch data for %s", t)
+    return results
@@ -3,6 +3,8 @@
 from typing import Optional, Iterable
 from sqlalchemy import (
     create_engine,
+    event,
+    func,
     Column,
     Integer,
     String,
@@ -10,9 +12,9 @@ from sqlalchemy import (
     Date,
     UniqueConstraint,
 )
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
 import pandas as pd
-from datetime import date
 
 
 # logger = logging.getLogger(__name__)
@@ -21,15 +23,16 @@ Base = declarative_base()
 
 class Ticker(Base):
     __tablename__ = "tickers"
-    id = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(Integer, primary_key=True)
     ticker = Column(String, unique=True, nullable=False, index=True)
     name = Column(String, nullable=True)
 
 
 class DailyMetric(Base):
     __tablename__ = "daily_metrics"
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    ticker = Column(String, nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    # (ticker, date) lookups and ticker-only scans use the unique index below
+    ticker = Column(String, nullable=False)
     date = Column(Date, nullable=False)
     close = Column(Float)
     sma_50 = Column(Float)
@@ -43,14 +46,45 @@ class DailyMetric(Base):
 
 class SignalEvent(Base):
     __tablename__ = "signal_events"
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    ticker = Column(String, nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    # ticker is the leading column of the unique index below
+    ticker = Column(String, nullable=False)
     date = Column(Date, nullable=False)
     signal = Column(String, nullable=False)
     meta = Column(String, nullable=True)  # JSON/text metadata
     __table_args__ = (UniqueConstraint("ticker", "date", "signal", name="uix_signal"),)
 
 
+_METRIC_COLUMNS = [
+    "close",
+    "sma_50",
+    "sma_200",
+    "pct_from_52wk_high",
+    "bvps",
+    "pb_ratio",
+    "ev",
+]
+
+
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Tune each new SQLite connection for bulk writes (WAL, relaxed fsync)."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in _SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
 def init_db(db_path: str = "financial_data.db") -> sessionmaker:
     """Initialize SQLite database and return session maker.
 
@@ -63,10 +97,68 @@ def init_db(db_path: str = "financial_data.db") -> sessionmaker:
     engine = create_engine(
         f"sqlite:///{db_path}", connect_args={"check_same_thread": False}
     )
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
     Base.metadata.create_all(engine)
     return sessionmaker(bind=engine)
 
 
+def _upsert_daily_metrics(session: Session, ticker: str, df: pd.DataFrame) -> None:
+    """Upsert daily metric rows for a ticker within an open session."""
+    if df.empty:
+        return
+    metrics = df.reindex(columns=_METRIC_COLUMNS).apply(pd.to_numeric, errors="coerce")
+    metrics = metrics.astype(object).where(metrics.notna(), None)
+    metrics.insert(0, "date", pd.to_datetime(df["date"]).dt.date.values)
+    metrics.insert(0, "ticker", ticker)
+    records = metrics.to_dict("records")
+
+    stmt = insert(DailyMetric)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["ticker", "date"],
+        set_={c: stmt.excluded[c] for c in _METRIC_COLUMNS},
+    )
+    session.execute(stmt, records)
+
+
+def _upsert_signals(session: Session, signals: Iterable[dict]) -> None:
+    """Upsert signal events within an open session."""
+    records = []
+    for s in signals:
+        # Handle both string and datetime dates
+        signal_date = s["date"]
+        if isinstance(signal_date, str):
+            signal_date = pd.to_datetime(signal_date).date()
+        elif hasattr(signal_date, "date"):
+            signal_date = signal_date.date()
+        records.append(
+            {
+                "ticker": s["ticker"],
+                "date": signal_date,
+                "signal": s["signal"],
+                "meta": s.get("meta"),
+            }
+        )
+    if not records:
+        return
+
+    stmt = insert(SignalEvent)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["ticker", "date", "signal"],
+        set_={"meta": stmt.excluded.meta},
+    )
+    session.execute(stmt, records)
+
+
+def _upsert_ticker(session: Session, ticker: str, company_name: Optional[str]) -> None:
+    """Upsert a ticker row within an open session, keeping a known name."""
+    stmt = insert(Ticker).values(ticker=ticker, name=company_name)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["ticker"],
+        set_={"name": func.coalesce(stmt.excluded.name, Ticker.name)},
+    )
+    session.execute(stmt)
+
+
 def save_daily_metrics(
     session_maker: sessionmaker, ticker: str, df: pd.DataFrame
 ) -> None:
@@ -77,30 +169,8 @@ def save_daily_metrics(
         ticker: Stock ticker symbol.
         df: DataFrame containing daily metrics data.
     """
-    session = session_maker()
-    try:
-        for _, row in df.iterrows():
-            obj = DailyMetric(
-                ticker=ticker,
-                date=row["date"]
-                if isinstance(row["date"], date)
-                else row["date"].date(),
-                close=float(row.get("close") or 0.0),
-                sma_50=float(row.get("sma_50") or 0.0),
-                sma_200=float(row.get("sma_200") or 0.0),
-                pct_from_52wk_high=float(row.get("pct_from_52wk_high") or 0.0),
-                bvps=float(row.get("bvps") or 0.0)
-                if row.get("bvps") is not None
-                else None,
-                pb_ratio=float(row.get("pb_ratio") or 0.0)
-                if row.get("pb_ratio") is not None
-                else None,
-                ev=float(row.get("ev") or 0.0) if row.get("ev") is not None else None,
-            )
-            session.merge(obj)
-        session.commit()
-    finally:
-        session.close()
+    with session_maker.begin() as session:
+        _upsert_daily_metrics(session, ticker, df)
 
 
 def save_signals(session_maker: sessionmaker, signals: Iterable[dict]) -> None:
@@ -110,26 +180,30 @@ def save_signals(session_maker: sessionmaker, signals: Iterable[dict]) -> None:
         session_maker: SQLAlchemy sessionmaker instance.
         signals: Iterable of signal dictionaries containing ticker, date, signal, and meta.
     """
-    session = session_maker()
-    try:
-        for s in signals:
-            # Handle both string and datetime dates
-            signal_date = s["date"]
-            if isinstance(signal_date, str):
-                signal_date = pd.to_datetime(signal_date).date()
-            elif hasattr(signal_date, "date"):
-                signal_date = signal_date.date()
-
-            obj = SignalEvent(
-                ticker=s["ticker"],
-                date=signal_date,
-                signal=s["signal"],
-                meta=s.get("meta"),
-            )
-            session.merge(obj)
-        session.commit()
-    finally:
-        session.close()
+    with session_maker.begin() as session:
+        _upsert_signals(session, signals)
+
+
+def save_analysis(
+    session_maker: sessionmaker,
+    ticker: str,
+    df: pd.DataFrame,
+    signals: Iterable[dict],
+    company_name: Optional[str] = None,
+) -> None:
+    """Save ticker info, daily metrics and signals in a single transaction.
+
+    Args:
+        session_maker: SQLAlchemy sessionmaker instance.
+        ticker: Stock ticker symbol.
+        df: DataFrame containing daily metrics data.
+        signals: Iterable of signal dictionaries for the ticker.
+        company_name: Company name; None keeps any name already stored.
+    """
+    with session_maker.begin() as session:
+        _upsert_ticker(session, ticker, company_name)
+        _upsert_daily_metrics(session, ticker, df)
+        _upsert_signals(session, signals)
 
 
 # def save_ticker_info(
@@ -145,20 +219,9 @@ def save_signals(session_maker: sessionmaker, signals: Iterable[dict]) -> None:
 #         session.close()
 
 def save_ticker_info(SessionMaker, ticker: str, company_name: str):
-    """Save ticker info idempotently (no duplicates)."""
-    session = SessionMaker()
-    try:
-        # Check if ticker already exists
-        obj = session.query(Ticker).filter_by(ticker=ticker).first()
-        if obj:
-            # Optionally update the name if it changed
-            obj.name = company_name
-        else:
-            obj = Ticker(ticker=ticker, name=company_name)
-            session.add(obj)
-        session.commit()
-    except Exception:
-        session.rollback()
-        raise
-    finally:
-        session.close()
+    """Save ticker info idempotently (no duplicates) with a single upsert.
+
+    A missing ``company_name`` keeps any name already stored for the ticker.
+    """
+    with SessionMaker.begin() as session:
+        _upsert_ticker(session, ticker, company_name)
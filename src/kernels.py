@@ -0,0 +1,79 @@
+"""NumPy kernels for the rolling-window and crossover computations.
+
+All functions take and return plain float64 arrays so that processor and
+signal code extract each column once and share the same implementations.
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+
+def rolling_means(
+    values: np.ndarray, windows: Sequence[Tuple[int, int]]
+) -> List[np.ndarray]:
+    """Trailing means for several ``(window, min_periods)`` pairs at once.
+
+    The NaN mask and the cumulative sum/count tables are built once and
+    shared by every window, so each extra window costs only a gather and a
+    divide. Each result matches ``Series.rolling(window, min_periods).mean()``:
+    NaNs are skipped and a value is emitted once the window holds
+    `min_periods` valid values.
+    """
+    valid = ~np.isnan(values)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    ccnt = np.concatenate(([0], np.cumsum(valid)))
+    end = np.arange(1, len(values) + 1)
+    out = []
+    for window, min_periods in windows:
+        start = np.maximum(end - window, 0)
+        total = csum[end] - csum[start]
+        count = ccnt[end] - ccnt[start]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out.append(np.where(count >= max(min_periods, 1), total / count, np.nan))
+    return out
+
+
+def rolling_mean(values: np.ndarray, window: int, min_periods: int) -> np.ndarray:
+    """Trailing mean over `window` rows; see :func:`rolling_means`."""
+    return rolling_means(values, [(window, min_periods)])[0]
+
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing max over `window` rows with ``min_periods=1`` semantics.
+
+    Uses the van Herk/Gil-Werman block scheme: per-block prefix and suffix
+    running maxima are combined so each window costs O(1), O(n) overall.
+    NaNs are ignored; an all-NaN window yields NaN.
+    """
+    n = len(values)
+    if n == 0:
+        return np.empty(0, dtype=np.float64)
+    w = max(1, min(window, n))
+    # front-pad so every output row has a full window; back-pad to whole blocks
+    n_blocks = -(-(n + w - 1) // w)
+    padded = np.full(n_blocks * w, np.nan)
+    padded[w - 1 : w - 1 + n] = values
+    blocks = padded.reshape(n_blocks, w)
+    prefix = np.fmax.accumulate(blocks, axis=1).ravel()
+    suffix = np.fmax.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    start = np.arange(n)
+    return np.fmax(suffix[start], prefix[start + w - 1])
+
+
+def crossover_indices(
+    short: np.ndarray, long: np.ndarray, upward: bool = True
+) -> np.ndarray:
+    """Return positions where `short` crosses `long`.
+
+    Works on the spread ``short - long`` in one pass: an upward cross is
+    ``prev <= 0 < cur`` and a downward cross ``prev >= 0 > cur``.
+    """
+    diff = short - long
+    prev, cur = diff[:-1], diff[1:]
+    # comparisons against NaN are False, so gaps never register as crosses
+    if upward:
+        crossed = (cur > 0) & (prev <= 0)
+    else:
+        crossed = (cur < 0) & (prev >= 0)
+    return np.flatnonzero(crossed) + 1
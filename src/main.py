@@ -2,18 +2,71 @@
 
 import typer
 import logging
-import json
 from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import pandas as pd
+from pydantic import TypeAdapter
 
 from .config import load_config
 from .data_fetcher import fetch_stock_data
 from .processor import process_data
 from .signals import detect_golden_crossover, detect_death_cross
-from .database import init_db, save_daily_metrics, save_signals, save_ticker_info
+from .database import init_db, save_analysis
 
 app = typer.Typer()
 logger = logging.getLogger("financial_analyzer")
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+_json_adapter = TypeAdapter(Any)
+
+
+def _load_config_or_defaults(config_path: Path) -> Dict[str, Any]:
+    """Load the YAML config, falling back to defaults when it is unavailable."""
+    try:
+        # an empty or comment-only file parses to None
+        return load_config(str(config_path)) or {}
+    except Exception:
+        logger.warning("Could not load config from %s — using defaults", config_path)
+        return {}
+
+
+def _fetch(ticker: str, cfg: Dict[str, Any]) -> Dict[str, Any]:
+    """Fetch raw data for a ticker using the cache settings from config."""
+    cache_cfg = cfg.get("cache") or {}
+    return fetch_stock_data(
+        ticker,
+        cache_dir=cache_cfg.get("dir"),
+        cache_ttl=cache_cfg.get("ttl_seconds", 3600),
+        n_quarters=cfg.get("data_settings", {}).get("fundamental_quarters"),
+    )
+
+
+def _json_line(obj: Any) -> bytes:
+    """Serialize obj as one newline-terminated line of compact UTF-8 JSON.
+
+    Uses pydantic's Rust serializer, which handles dates natively; ``str``
+    is only the fallback for values JSON cannot represent.
+    """
+    return _json_adapter.dump_json(obj, fallback=str) + b"\n"
+
+
+def _analyze(
+    ticker: str, raw: Dict[str, Any], cfg: Dict[str, Any]
+) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """Compute metrics and crossover signals for one ticker's raw data."""
+    df = process_data(raw, cfg)
+    df_for_signals = df.reset_index() if "date" not in df.columns else df
+    gc_dates = detect_golden_crossover(df_for_signals)
+    dc_dates = detect_death_cross(df_for_signals)
+
+    signals = []
+    signals.extend(
+        [{"ticker": ticker, "date": d, "signal": "golden_cross"} for d in gc_dates]
+    )
+    signals.extend(
+        [{"ticker": ticker, "date": d, "signal": "death_cross"} for d in dc_dates]
+    )
+    return df_for_signals, signals
 
 
 @app.command()
@@ -33,11 +86,7 @@ def main(
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger(__name__)
 
-    try:
-        cfg = load_config(str(config_path))
-    except Exception:
-        logger.warning("Could not load config from %s — using defaults", config_path)
-        cfg = {}
+    cfg = _load_config_or_defaults(config_path)
 
     SessionMaker = init_db(str(db_path))
 
@@ -47,45 +96,27 @@ def main(
 
         # 2. Fetch and validate data
         logger.info("Fetching and validating data for %s", ticker)
-        raw = fetch_stock_data(ticker)
-
-        # 3. Process and calculate metrics
-        logger.info("Processing data and calculating metrics")
-        df = process_data(raw, cfg)
-
-        # 4. Detect signals
-        logger.info("Detecting trading signals")
-        df_for_signals = df.reset_index() if "date" not in df.columns else df
-        gc_dates = detect_golden_crossover(df_for_signals)
-        dc_dates = detect_death_cross(df_for_signals)
-
-        # Combine signals
-        signals = []
-        signals.extend(
-            [{"ticker": ticker, "date": d, "signal": "golden_cross"} for d in gc_dates]
-        )
-        signals.extend(
-            [{"ticker": ticker, "date": d, "signal": "death_cross"} for d in dc_dates]
-        )
+        raw = _fetch(ticker, cfg)
+
+        # 3-4. Process, calculate metrics and detect signals
+        logger.info("Processing data and detecting trading signals")
+        df_for_signals, signals = _analyze(ticker, raw, cfg)
 
         # 5. Save to database
         logger.info("Saving data to database")
         company_name = raw.get("info", {}).get("longName")
-        save_ticker_info(SessionMaker, ticker, company_name)
-        save_daily_metrics(SessionMaker, ticker, df_for_signals)
-        save_signals(SessionMaker, signals)
+        save_analysis(SessionMaker, ticker, df_for_signals, signals, company_name)
 
         # 6. Save to JSON
         logger.info("Writing output JSON")
         out = {
             "ticker": ticker,
             "source_used": raw.get("source_used"),
-            "metrics_count": len(df),
+            "metrics_count": len(df_for_signals),
             "signals": signals,
             "config": cfg,
         }
-        with open(output, "w", encoding="utf-8") as fh:
-            json.dump(out, fh, default=str, indent=2)
+        Path(output).write_bytes(_json_line(out))
 
         logger.info("Pipeline completed successfully for %s", ticker)
         logger.info("Output saved to %s", output)
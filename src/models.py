@@ -3,8 +3,10 @@
 from datetime import datetime
 from decimal import Decimal
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, validator, condecimal
+from pydantic import BaseModel, condecimal, model_validator
 
+# Decimal is kept for balance-sheet amounts; prices and per-day metrics are
+# float64 like the DataFrames and SQLite columns they come from.
 Money = condecimal(max_digits=30, decimal_places=6)
 
 
@@ -12,7 +14,8 @@ class StockDataResponse(BaseModel):
     """Validate raw API responses from yfinance."""
 
     ticker: str
-    prices: List[Dict[str, Any]]
+    # pd.DataFrame as returned by the fetcher, or a list of price records
+    prices: Any
     quarterly_fundamentals: List[Dict[str, Any]]
     info: Dict[str, Any]
     source_used: str
@@ -20,41 +23,23 @@ class StockDataResponse(BaseModel):
 
 class PricePoint(BaseModel):
     date: datetime
-    open: Money
-    high: Money
-    low: Money
-    close: Money
+    open: float
+    high: float
+    low: float
+    close: float
     volume: int
 
-    @validator("high")
-    def high_ge_low(cls, v, values):
-        if "low" in values and v < values["low"]:
+    @model_validator(mode="after")
+    def _ohlc_invariants(self) -> "PricePoint":
+        """Check low <= open/close <= high in a single pass."""
+        low, high = self.low, self.high
+        if high < low:
             raise ValueError("high must be >= low")
-        return v
-
-    @validator("close")
-    def close_ge_low(cls, v, values):
-        if "low" in values and v < values["low"]:
-            raise ValueError("close must be >= low")
-        return v
-
-    @validator("close")
-    def close_le_high(cls, v, values):
-        if "high" in values and v > values["high"]:
-            raise ValueError("close must be <= high")
-        return v
-
-    @validator("open")
-    def open_ge_low(cls, v, values):
-        if "low" in values and v < values["low"]:
-            raise ValueError("open must be >= low")
-        return v
-
-    @validator("open")
-    def open_le_high(cls, v, values):
-        if "high" in values and v > values["high"]:
-            raise ValueError("open must be <= high")
-        return v
+        if not low <= self.close <= high:
+            raise ValueError("close must be between low and high")
+        if not low <= self.open <= high:
+            raise ValueError("open must be between low and high")
+        return self
 
 
 class QuarterlyFundamentals(BaseModel):
@@ -72,14 +57,14 @@ class QuarterlyFundamentals(BaseModel):
 class ProcessedDailyMetrics(BaseModel):
     date: datetime
     ticker: str
-    close: Money
-    sma_50: Optional[Money] = None
-    sma_200: Optional[Money] = None
-    high_52wk: Optional[Money] = None
-    pct_from_52wk_high: Optional[Decimal] = None
-    bvps: Optional[Decimal] = None
-    price_to_book: Optional[Decimal] = None
-    enterprise_value: Optional[Money] = None
+    close: float
+    sma_50: Optional[float] = None
+    sma_200: Optional[float] = None
+    high_52wk: Optional[float] = None
+    pct_from_52wk_high: Optional[float] = None
+    bvps: Optional[float] = None
+    price_to_book: Optional[float] = None
+    enterprise_value: Optional[float] = None
     # allow extension
     extras: Dict[str, Any] = {}
 
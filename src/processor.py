@@ -7,41 +7,159 @@ from typing import Dict, Any, List, Optional
 import numpy as np
 import pandas as pd
 
+from .kernels import rolling_max, rolling_means
+
 logger = logging.getLogger(__name__)
 
+# Lower-cased price column names mapped to the canonical names used below
+_CANONICAL = {
+    "date": "date",
+    "datetime": "date",
+    "open": "open",
+    "high": "high",
+    "low": "low",
+    "close": "close",
+    "adjclose": "close",
+    "adj_close": "close",
+    "close_adj": "close",
+    "volume": "volume",
+}
+_PRICE_COLUMNS = set(_CANONICAL.values())
+
+
+def _lower_column_map(df: pd.DataFrame) -> Dict[str, str]:
+    """Map lower-cased column names to actual names (first occurrence wins)."""
+    lower_map: Dict[str, str] = {}
+    for col in df.columns:
+        lower_map.setdefault(col.lower(), col)
+    return lower_map
 
-def _find_col(df: pd.DataFrame, candidates: List[str]) -> Optional[str]:
-    """Return first matching column name in df from candidates, else None."""
+
+def _find_col(lower_map: Dict[str, str], candidates: List[str]) -> Optional[str]:
+    """Return first column matching a candidate case-insensitively, else None."""
     for c in candidates:
-        if c in df.columns:
-            return c
-        # check case-insensitive
-        for col in df.columns:
-            if col.lower() == c.lower():
-                return col
+        col = lower_map.get(c.lower())
+        if col is not None:
+            return col
     return None
 
 
+def _naive_dates(dates: pd.Series) -> pd.Series:
+    """Return dates as naive datetime64, keeping the exchange's wall-clock time.
+
+    Naive datetime64 input is returned as is and tz-aware input only drops its
+    zone; anything else (e.g. strings) goes through ``pd.to_datetime``.
+    """
+    if isinstance(dates.dtype, pd.DatetimeTZDtype):
+        return dates.dt.tz_localize(None)
+    if pd.api.types.is_datetime64_dtype(dates.dtype):
+        return dates
+    parsed = pd.to_datetime(dates)
+    return parsed.dt.tz_localize(None) if parsed.dt.tz is not None else parsed
+
+
+def _fundamental_metrics(
+    prices: pd.DataFrame, close: np.ndarray, info: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Compute BVPS, P/B and simplified EV as arrays or broadcastable scalars."""
+    market_cap = info.get("marketCap") or info.get("market_cap")
+    mc = float(pd.to_numeric(market_cap or np.nan, errors="coerce"))
+    # Without fundamentals columns or a market cap every value is NaN; skip
+    # the column lookups entirely (common for tickers with sparse info).
+    if np.isnan(mc) and set(prices.columns) <= _PRICE_COLUMNS:
+        return {"bvps": np.nan, "pb_ratio": np.nan, "ev": np.nan}
+
+    out: Dict[str, Any] = {}
+
+    # Fundamental ratios: BVPS and P/B
+    # Accept multiple possible column names for equity and shares
+    lower_map = _lower_column_map(prices)
+    eq_col = _find_col(
+        lower_map,
+        [
+            "total_equity",
+            "totalShareholdersEquity",
+            "totalStockholdersEquity",
+            "total_equity_fund",
+        ],
+    )
+    shares_col = _find_col(
+        lower_map, ["shares_outstanding", "shares", "common_shares_outstanding"]
+    )
+    if eq_col and shares_col:
+        equity = prices[eq_col].to_numpy(dtype=np.float64)
+        shares = prices[shares_col].to_numpy(dtype=np.float64)
+        # protect against zero division / missing
+        with np.errstate(invalid="ignore", divide="ignore"):
+            bvps = np.where((shares > 0) & ~np.isnan(equity), equity / shares, np.nan)
+        # P/B only where bvps is finite and non-zero; the inner where gives the
+        # masked-out rows a divisor of 1 so they never divide by zero or NaN
+        valid = np.isfinite(bvps) & (bvps != 0.0)
+        out["bvps"] = bvps
+        out["pb_ratio"] = np.where(valid, close / np.where(valid, bvps, 1.0), np.nan)
+    else:
+        out["bvps"] = np.nan
+        out["pb_ratio"] = np.nan
+
+    # Simplified Enterprise Value (EV) estimate:
+    # EV ≈ marketCap + total_liabilities - cash_and_equivalents
+    # find liability and cash columns in merged fundamentals or info
+    liab_col = _find_col(
+        lower_map, ["total_liab", "total_liabilities", "totalLiab", "totalLiabilities"]
+    )
+    cash_col_fund = _find_col(
+        lower_map, ["cash_and_equivalents", "cash", "cash_equivalents"]
+    )
+    cash_info = (
+        info.get("totalCash") or info.get("cash") or info.get("cashAndCashEquivalents")
+    )
+
+    # compute EV column-wise; scalars broadcast over the per-row fundamentals
+    if np.isnan(mc):
+        # market cap missing: cannot compute reliably (scalar NaN is broadcast)
+        out["ev"] = np.nan
+    else:
+        tl = (
+            pd.to_numeric(prices[liab_col], errors="coerce").to_numpy(dtype=np.float64)
+            if liab_col
+            else np.nan
+        )
+        cash_default = float(pd.to_numeric(cash_info or np.nan, errors="coerce"))
+        if cash_col_fund:
+            cash = pd.to_numeric(prices[cash_col_fund], errors="coerce").to_numpy(
+                dtype=np.float64
+            )
+            cash = np.where(np.isnan(cash), cash_default, cash)
+        else:
+            cash = cash_default
+        # a scalar result (no per-row fundamentals) is broadcast the same way
+        out["ev"] = mc + np.nan_to_num(tl, nan=0.0) - np.nan_to_num(cash, nan=0.0)
+    return out
+
+
 def process_data(
     raw_data: Dict[str, Any], cfg: Optional[Dict[str, Any]] = None
 ) -> pd.DataFrame:
     """Process raw stock and fundamental data into a metrics DataFrame.
 
     The function:
-    - normalizes price input (list[dict] or DataFrame),
-    - aligns quarterly fundamentals to daily prices using merge_asof (backward),
+    - normalizes the price DataFrame's column names and dates,
+    - aligns quarterly fundamentals to daily prices (latest on or before each date),
     - forward-fills fundamentals,
     - computes technical indicators (50/200 SMA, 52-week high, % from high),
     - computes fundamental ratios (BVPS, P/B) and simplified EV,
     - is tolerant to missing config and short histories (recent IPOs).
 
     Args:
-        raw_data: dictionary returned by fetcher with keys like "prices",
-            "quarterly_fundamentals", and "info".
+        raw_data: dictionary returned by fetcher with keys like "prices"
+            (a DataFrame), "quarterly_fundamentals", and "info".
         cfg: optional config dict (see config.yaml); sensible defaults used.
 
     Returns:
         pd.DataFrame with one row per trading date and computed metrics.
+
+    Raises:
+        TypeError: if ``raw_data["prices"]`` is not a DataFrame.
     """
     cfg = cfg or {}
     data_settings = cfg.get("data_settings", {})
@@ -49,47 +167,39 @@ def process_data(
     window_long: int = data_settings.get("min_trading_days_for_sma", 200)
     window_52wk: int = data_settings.get("rolling_days_for_52week", 252)
 
-    # Prepare prices DataFrame
-    prices_raw = raw_data.get("prices", [])
-    if isinstance(prices_raw, pd.DataFrame):
-        prices = prices_raw.copy()
-    else:
-        prices = pd.DataFrame(prices_raw)
+    # Prices arrive as a DataFrame from the fetcher. No defensive copy: the
+    # rename below returns a new frame, so the caller's DataFrame is never mutated.
+    prices = raw_data.get("prices")
+    if prices is None:
+        prices = pd.DataFrame()
+    elif not isinstance(prices, pd.DataFrame):
+        raise TypeError(
+            "raw_data['prices'] must be a pandas DataFrame, "
+            f"got {type(prices).__name__}"
+        )
 
     if prices.empty:
         logger.warning("No price data available in raw_data; returning empty DataFrame")
         return pd.DataFrame()
 
     # Normalize column names
-    cols_map = {}
-    for c in prices.columns:
-        lc = c.lower()
-        if lc in {"date", "datetime"}:
-            cols_map[c] = "date"
-        elif lc in {"open"}:
-            cols_map[c] = "open"
-        elif lc in {"high"}:
-            cols_map[c] = "high"
-        elif lc in {"low"}:
-            cols_map[c] = "low"
-        elif lc in {"close", "adjclose", "adj_close", "close_adj"}:
-            cols_map[c] = "close"
-        elif lc in {"volume"}:
-            cols_map[c] = "volume"
-    prices = prices.rename(columns=cols_map)
+    prices = prices.rename(
+        columns={
+            c: _CANONICAL[c.lower()] for c in prices.columns if c.lower() in _CANONICAL
+        }
+    )
 
     # Ensure date column and proper dtypes
     if "date" not in prices.columns:
         logger.error("Price records missing 'date' column")
         return pd.DataFrame()
-    prices["date"] = pd.to_datetime(prices["date"]).dt.tz_localize(
-        None
-    )  # Remove timezone info
+    prices["date"] = _naive_dates(prices["date"])
     prices = prices.sort_values("date").reset_index(drop=True)
 
     # Load quarterly fundamentals if present and normalize
     qfunds_raw = raw_data.get("quarterly_fundamentals") or []
     qdf = pd.DataFrame(qfunds_raw)
+    fund_cols: List[str] = []
     if not qdf.empty:
         # Accept either 'as_of' or 'date' as fundamentals date column
         if "as_of" in qdf.columns:
@@ -104,14 +214,18 @@ def process_data(
         if "date" in qdf.columns:
             qdf["date"] = pd.to_datetime(qdf["date"])
             qdf = qdf.sort_values("date").reset_index(drop=True)
-            # align fundamentals to prices using merge_asof (use most recent fundamental on or before price date)
-            prices = pd.merge_asof(
-                prices,
-                qdf,
-                on="date",
-                direction="backward",
-                suffixes=("", "_fund"),
+            # align fundamentals to prices: for each price date take the most
+            # recent fundamental on or before it (-1 = none yet, becomes NaN)
+            q_dates = qdf["date"].to_numpy(dtype="datetime64[ns]")
+            p_dates = prices["date"].to_numpy(dtype="datetime64[ns]")
+            idx = np.searchsorted(q_dates, p_dates, side="right") - 1
+            aligned = qdf.drop(columns="date").reindex(idx)
+            aligned.index = prices.index
+            aligned = aligned.rename(
+                columns={c: f"{c}_fund" for c in aligned.columns if c in prices.columns}
             )
+            prices = pd.concat([prices, aligned], axis=1)
+            fund_cols = list(aligned.columns)
         else:
             logger.warning(
                 "Quarterly fundamentals present but no recognizable date column; ignoring alignment"
@@ -126,105 +240,43 @@ def process_data(
     # 2. Most fundamental metrics don't change significantly between quarters
     # 3. It provides the most recent available data for daily analysis
     # 4. Alternative approaches (interpolation, synthetic values) would be less accurate
-    prices = prices.sort_values("date").ffill().reset_index(drop=True)
+    # The alignment already carries each quarter forward; ffill only fills items a
+    # quarter did not report. Prices are sorted above, so no re-sort is needed.
+    if fund_cols:
+        prices[fund_cols] = prices[fund_cols].ffill()
+
+    # Work on plain arrays and assemble all metric columns in one step at the end
+    close = prices["close"].to_numpy(dtype=np.float64)
+    metrics: Dict[str, Any] = {}
 
     # Technical indicators: SMA with min_periods adaptive to available history
     available = len(prices)
-    if available <= 0:
-        prices["sma_50"] = pd.NA
-        prices["sma_200"] = pd.NA
-    else:
-        minp_short = min(window_short, max(1, available))
-        minp_long = min(window_long, max(1, available))
-        prices["sma_50"] = (
-            prices["close"].rolling(window=window_short, min_periods=minp_short).mean()
-        )
-        prices["sma_200"] = (
-            prices["close"].rolling(window=window_long, min_periods=minp_long).mean()
-        )
+    minp_short = min(window_short, max(1, available))
+    minp_long = min(window_long, max(1, available))
+    # both windows share one pass of cumulative sums over close
+    metrics["sma_50"], metrics["sma_200"] = rolling_means(
+        close, [(window_short, minp_short), (window_long, minp_long)]
+    )
 
     # 52-week high and percent from high
-    prices["52wk_high"] = (
-        prices["close"].rolling(window=window_52wk, min_periods=1).max()
-    )
+    high_52wk = rolling_max(close, window_52wk)
+    metrics["52wk_high"] = high_52wk
     # avoid divide-by-zero
-    prices["pct_from_52wk_high"] = np.where(
-        prices["52wk_high"] > 0,
-        (prices["close"] - prices["52wk_high"]) / prices["52wk_high"],
-        np.nan,
-    )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        metrics["pct_from_52wk_high"] = np.where(
+            high_52wk > 0, (close - high_52wk) / high_52wk, np.nan
+        )
 
-    # Fundamental ratios: BVPS and P/B
-    # Accept multiple possible column names for equity and shares
-    eq_col = _find_col(
-        prices,
+    metrics.update(_fundamental_metrics(prices, close, raw_data.get("info") or {}))
+
+    # computed metrics replace any same-named columns from the fundamentals
+    prices = pd.concat(
         [
-            "total_equity",
-            "totalShareholdersEquity",
-            "totalStockholdersEquity",
-            "total_equity_fund",
+            prices.drop(columns=list(metrics), errors="ignore"),
+            pd.DataFrame(metrics, index=prices.index),
         ],
+        axis=1,
     )
-    shares_col = _find_col(
-        prices, ["shares_outstanding", "shares", "common_shares_outstanding"]
-    )
-    if eq_col and shares_col:
-        # protect against zero division / missing
-        prices["bvps"] = np.where(
-            (prices[shares_col] > 0) & (~prices[eq_col].isna()),
-            prices[eq_col] / prices[shares_col],
-            np.nan,
-        )
-        prices["pb_ratio"] = np.where(
-            prices["bvps"].replace({0: np.nan}).notna(),
-            prices["close"] / prices["bvps"],
-            np.nan,
-        )
-    else:
-        prices["bvps"] = np.nan
-        prices["pb_ratio"] = np.nan
-
-    # Simplified Enterprise Value (EV) estimate:
-    # EV ≈ marketCap + total_liabilities - cash_and_equivalents
-    info = raw_data.get("info") or {}
-    market_cap = info.get("marketCap") or info.get("market_cap")
-    # find liability and cash columns in merged fundamentals or info
-    liab_col = _find_col(
-        prices, ["total_liab", "total_liabilities", "totalLiab", "totalLiabilities"]
-    )
-    cash_col_fund = _find_col(
-        prices, ["cash_and_equivalents", "cash", "cash_equivalents"]
-    )
-    cash_info = (
-        info.get("totalCash") or info.get("cash") or info.get("cashAndCashEquivalents")
-    )
-
-    # compute EV per-row where possible
-    def _compute_ev(row):
-        mc = market_cap or np.nan
-        tl = row[liab_col] if liab_col and pd.notna(row.get(liab_col)) else np.nan
-        cash = (
-            row[cash_col_fund]
-            if cash_col_fund and pd.notna(row.get(cash_col_fund))
-            else (cash_info or np.nan)
-        )
-        # prefer numeric coercion
-        try:
-            parts = [float(x) for x in (mc, tl, cash)]
-        except Exception:
-            return np.nan
-        mc_v, tl_v, cash_v = parts
-        # if market cap missing, cannot compute reliably
-        if np.isnan(mc_v):
-            return np.nan
-        ev_v = (
-            mc_v
-            + (tl_v if not np.isnan(tl_v) else 0.0)
-            - (cash_v if not np.isnan(cash_v) else 0.0)
-        )
-        return ev_v
-
-    prices["ev"] = prices.apply(_compute_ev, axis=1)
 
     # Ensure `date` column is present for downstream use
     if "date" not in prices.columns:
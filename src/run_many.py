@@ -0,0 +1,95 @@
+"""CLI entrypoint for running the pipeline over several tickers at once."""
+
+import logging
+from pathlib import Path
+from typing import List
+
+import typer
+
+from .data_fetcher import fetch_many
+from .database import init_db, save_analysis
+from .main import _analyze, _json_line, _load_config_or_defaults
+
+app = typer.Typer()
+logger = logging.getLogger("financial_analyzer")
+
+
+@app.command()
+def run_many(
+    tickers: List[str] = typer.Option(
+        ..., "--ticker", "-t", help="Ticker symbol; repeat for each ticker"
+    ),
+    output: Path = typer.Option(
+        ..., "--output", "-o", help="Output JSON Lines path (one line per ticker)"
+    ),
+    config_path: Path = typer.Option(
+        Path("config.yaml"), "--config", "-c", help="Path to config YAML"
+    ),
+    db_path: Path = typer.Option(
+        Path("financial_data.db"), "--db", "-d", help="Path to SQLite DB"
+    ),
+    threads: int = typer.Option(
+        8, "--threads", "-j", min=1, help="Concurrent yfinance fetches"
+    ),
+):
+    """Run the pipeline for several tickers, fetching them concurrently.
+
+    Prices are downloaded in multi-symbol batches and fundamentals fan out
+    over a thread pool; processing and database writes stay on the main
+    thread. Each ticker is committed in its own transaction before its
+    output line is written, so the output only lists saved tickers.
+    """
+    cfg = _load_config_or_defaults(config_path)
+    SessionMaker = init_db(str(db_path))
+
+    logger.info("Fetching %d tickers with %d threads", len(tickers), threads)
+    cache_cfg = cfg.get("cache") or {}
+    try:
+        raws = fetch_many(
+            tickers,
+            cache_dir=cache_cfg.get("dir"),
+            cache_ttl=cache_cfg.get("ttl_seconds", 3600),
+            threads=threads,
+            n_quarters=cfg.get("data_settings", {}).get("fundamental_quarters"),
+        )
+    except ValueError as e:
+        # invalid settings (e.g. fundamental_quarters below 1)
+        logger.error("Invalid configuration in %s: %s", config_path, e)
+        raise typer.Exit(code=1)
+
+    # One JSON line per ticker, written only once its data is committed
+    n_saved = 0
+    with open(output, "wb") as fh:
+        for ticker in tickers:
+            if ticker not in raws:
+                continue
+            raw = raws[ticker]
+            try:
+                df, signals = _analyze(ticker, raw, cfg)
+                company_name = raw.get("info", {}).get("longName")
+                save_analysis(SessionMaker, ticker, df, signals, company_name)
+            except Exception:
+                logger.exception("Pipeline failed for %s", ticker)
+                continue
+            n_saved += 1
+            fh.write(
+                _json_line(
+                    {
+                        "ticker": ticker,
+                        "source_used": raw.get("source_used"),
+                        "metrics_count": len(df),
+                        "signals": signals,
+                    }
+                )
+            )
+            fh.flush()
+    logger.info(
+        "Saved %d of %d tickers; output saved to %s", n_saved, len(tickers), output
+    )
+
+    if n_saved < len(tickers):
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
@@ -1,12 +1,34 @@
 """Detect golden crossover (50-day SMA crossing above 200-day SMA)."""
 
 from typing import List
+import numpy as np
 import pandas as pd
 import logging
 
+from .kernels import crossover_indices
+
 logger = logging.getLogger(__name__)
 
 
+def _crossing_rows(
+    df: pd.DataFrame, sma_short: str, sma_long: str, upward: bool
+) -> np.ndarray:
+    """Return row positions where short SMA crosses long SMA."""
+    short_sma = df[sma_short].to_numpy(dtype=np.float64, na_value=np.nan)
+    long_sma = df[sma_long].to_numpy(dtype=np.float64, na_value=np.nan)
+    return crossover_indices(short_sma, long_sma, upward)
+
+
+def _iso_dates(df: pd.DataFrame, rows: np.ndarray) -> List[str]:
+    """Format the 'date' values at `rows` as YYYY-MM-DD strings in bulk."""
+    dates = df["date"]
+    if isinstance(dates.dtype, pd.DatetimeTZDtype):
+        # keep the exchange's local calendar day; casting would convert to UTC
+        dates = dates.dt.tz_localize(None)
+    days = dates.to_numpy(dtype="datetime64[D]")[rows]
+    return days.astype(str).tolist()
+
+
 def detect_golden_crossover(
     df: pd.DataFrame, sma_short: str = "sma_50", sma_long: str = "sma_200"
 ) -> List[str]:
@@ -24,19 +46,8 @@ def detect_golden_crossover(
         logger.warning("SMA columns not present; returning empty list")
         return []
 
-    short_sma = df[sma_short]
-    long_sma = df[sma_long]
-
-    # Ensure aligned and no NaNs for the comparison days
-    mask = (short_sma.notna()) & (long_sma.notna())
-
-    # previous-day relation
-    prev_short = short_sma.shift(1)
-    prev_long = long_sma.shift(1)
-
-    cross_up = (short_sma > long_sma) & (prev_short <= prev_long) & mask
-    dates = df.loc[cross_up, "date"].dt.strftime("%Y-%m-%d").tolist()
-    return dates
+    rows = _crossing_rows(df, sma_short, sma_long, upward=True)
+    return _iso_dates(df, rows)
 
 
 def detect_death_cross(
@@ -56,16 +67,5 @@ def detect_death_cross(
         logger.warning("SMA columns not present; returning empty list")
         return []
 
-    short_sma = df[sma_short]
-    long_sma = df[sma_long]
-
-    # Ensure aligned and no NaNs for the comparison days
-    mask = (short_sma.notna()) & (long_sma.notna())
-
-    # previous-day relation
-    prev_short = short_sma.shift(1)
-    prev_long = long_sma.shift(1)
-
-    cross_down = (short_sma < long_sma) & (prev_short >= prev_long) & mask
-    dates = df.loc[cross_down, "date"].dt.strftime("%Y-%m-%d").tolist()
-    return dates
+    rows = _crossing_rows(df, sma_short, sma_long, upward=False)
+    return _iso_dates(df, rows)
@@ -1,20 +1,20 @@
 import pytest
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
 
 
 @pytest.fixture
 def sample_price_df():
-    base = datetime(2020, 1, 1)
-    dates = [base + timedelta(days=i) for i in range(400)]
+    n = 400
+    steps = np.arange(n, dtype=np.float64) * 0.1
     df = pd.DataFrame(
         {
-            "date": dates,
-            "open": 100 + (pd.Series(range(400)) * 0.1),
-            "high": 101 + (pd.Series(range(400)) * 0.1),
-            "low": 99 + (pd.Series(range(400)) * 0.1),
-            "close": 100 + (pd.Series(range(400)) * 0.1),
-            "volume": 1000,
+            "date": pd.date_range("2020-01-01", periods=n),
+            "open": 100 + steps,
+            "high": 101 + steps,
+            "low": 99 + steps,
+            "close": 100 + steps,
+            "volume": np.full(n, 1000, dtype=np.int64),
         }
     )
     return df
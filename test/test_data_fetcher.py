@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.data_fetcher as data_fetcher
+from src.data_fetcher import (
+    _cache_file,
+    _read_cache,
+    _write_cache,
+    fetch_many,
+    fetch_price_batches,
+    fetch_stock_data,
+)
+
+
+def test_cache_round_trip_keeps_dtypes_and_zone(tmp_path, sample_price_df):
+    prices = sample_price_df.assign(
+        date=sample_price_df["date"].dt.tz_localize("America/New_York")
+    )
+    response = {
+        "ticker": "TEST",
+        "prices": prices,
+        "quarterly_fundamentals": [
+            {"end_date": pd.Timestamp("2020-03-31"), "total_equity": 1e9}
+        ],
+        "info": {"longName": "Test Inc.", "marketCap": 2e9},
+        "source_used": "quarterly_balance_sheet",
+    }
+    path = _cache_file(tmp_path, "TEST", "5y")
+    _write_cache(path, response)
+
+    cached = _read_cache(path, ttl_seconds=60)
+    pd.testing.assert_frame_equal(cached["prices"], prices)
+    assert cached["prices"]["date"].dt.tz is not None
+    assert cached["quarterly_fundamentals"][0]["end_date"] == pd.Timestamp("2020-03-31")
+    assert cached["info"] == response["info"]
+
+
+def test_cache_ignores_other_format_versions(tmp_path):
+    path = _cache_file(tmp_path, "TEST", "5y")
+    path.write_text('{"version": 0, "response": {}}', encoding="utf-8")
+    assert _read_cache(path, ttl_seconds=60) is None
+
+
+def test_zero_quarters_is_rejected():
+    with pytest.raises(ValueError):
+        fetch_stock_data("TEST", n_quarters=0)
+    with pytest.raises(ValueError):
+        fetch_many(["TEST"], n_quarters=0)
+
+
+def _history(dates, closes, volume):
+    """Frame shaped like a yfinance history/download result for one symbol."""
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame(
+        {
+            "Open": closes,
+            "High": closes + 1,
+            "Low": closes - 1,
+            "Close": closes,
+            "Adj Close": closes,
+            "Volume": volume,
+        },
+        index=pd.DatetimeIndex(dates, name="Date"),
+    )
+
+
+class _FakeTicker:
+    history_calls = []
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+        self.quarterly_balance_sheet = pd.DataFrame()
+        self.balance_sheet = pd.DataFrame()
+        self.info = {"longName": ticker}
+
+    def history(self, **kwargs):
+        _FakeTicker.history_calls.append(self.ticker)
+        return _history(["2020-01-02", "2020-01-03"], [10.0, 11.0], 5)
+
+
+@pytest.fixture
+def fake_yf(monkeypatch):
+    dates = ["2020-01-02", "2020-01-03", "2020-01-06"]
+    # BBB's market was closed on 2020-01-03: its row is all NaN in the batch
+    batch = pd.concat(
+        {
+            "AAA": _history(dates, [1.0, 2.0, 3.0], [100, np.nan, 300]),
+            "BBB": _history(dates, [5.0, np.nan, 7.0], [10, np.nan, 30]),
+        },
+        axis=1,
+    )
+    monkeypatch.setattr(data_fetcher.yf, "download", lambda *a, **k: batch)
+    monkeypatch.setattr(data_fetcher.yf, "Ticker", _FakeTicker)
+    _FakeTicker.history_calls = []
+
+
+def test_fetch_price_batches_splits_multiindex(fake_yf):
+    prices = fetch_price_batches(["AAA", "BBB", "CCC"])
+
+    assert set(prices) == {"AAA", "BBB"}  # CCC missing from the batch
+    assert list(prices["AAA"].columns) == data_fetcher._PRICE_COLUMNS
+    assert prices["AAA"]["close"].tolist() == [1.0, 2.0, 3.0]
+    # a missing volume on a trading day becomes 0 so the column stays int64
+    assert prices["AAA"]["volume"].tolist() == [100, 0, 300]
+    # the other market's holiday is dropped, not kept as a NaN row
+    assert prices["BBB"]["date"].dt.day.tolist() == [2, 6]
+    assert prices["BBB"]["volume"].dtype == "int64"
+
+
+def test_fetch_many_falls_back_to_history_for_missing_tickers(fake_yf):
+    results = fetch_many(["AAA", "BBB", "CCC"], threads=2)
+
+    assert set(results) == {"AAA", "BBB", "CCC"}
+    assert _FakeTicker.history_calls == ["CCC"]
+    assert results["CCC"]["prices"]["close"].tolist() == [10.0, 11.0]
+    assert results["AAA"]["info"] == {"longName": "AAA"}
@@ -0,0 +1,94 @@
+import pandas as pd
+import pytest
+from sqlalchemy import func, select
+
+from src.database import (
+    DailyMetric,
+    SignalEvent,
+    Ticker,
+    init_db,
+    save_analysis,
+    save_daily_metrics,
+    save_signals,
+    save_ticker_info,
+)
+from src.processor import process_data
+
+
+def test_save_daily_metrics_is_idempotent(tmp_path, sample_price_df):
+    session_maker = init_db(str(tmp_path / "test.db"))
+    out = process_data({"ticker": "TEST", "prices": sample_price_df})
+
+    save_daily_metrics(session_maker, "TEST", out)
+    save_daily_metrics(session_maker, "TEST", out)
+
+    session = session_maker()
+    try:
+        count = session.scalar(select(func.count()).select_from(DailyMetric))
+        last = session.scalars(
+            select(DailyMetric).order_by(DailyMetric.date.desc())
+        ).first()
+    finally:
+        session.close()
+    assert count == len(sample_price_df)
+    assert abs(last.sma_50 - out["sma_50"].iloc[-1]) < 1e-6
+    # NaN metrics (no fundamentals) are stored as NULL
+    assert last.bvps is None
+
+
+def test_save_analysis_rolls_back_ticker_on_failure(tmp_path, sample_price_df):
+    session_maker = init_db(str(tmp_path / "test.db"))
+    out = process_data({"ticker": "TEST", "prices": sample_price_df})
+    bad_signals = [{"ticker": "TEST", "date": "2020-06-01"}]  # no "signal" key
+
+    with pytest.raises(KeyError):
+        save_analysis(session_maker, "TEST", out, bad_signals, "Test Inc.")
+
+    with session_maker() as session:
+        assert session.scalar(select(func.count()).select_from(Ticker)) == 0
+        assert session.scalar(select(func.count()).select_from(DailyMetric)) == 0
+
+
+def test_save_signals_upserts_and_updates_meta(tmp_path):
+    session_maker = init_db(str(tmp_path / "test.db"))
+    signals = [
+        {"ticker": "TEST", "date": "2020-06-01", "signal": "golden_cross"},
+        {
+            "ticker": "TEST",
+            "date": pd.Timestamp("2020-09-01"),
+            "signal": "death_cross",
+            "meta": "v1",
+        },
+    ]
+    save_signals(session_maker, signals)
+    save_signals(session_maker, signals)
+    # same (ticker, date, signal) key, given as a string: meta is updated
+    save_signals(
+        session_maker,
+        [
+            {
+                "ticker": "TEST",
+                "date": "2020-09-01",
+                "signal": "death_cross",
+                "meta": "v2",
+            }
+        ],
+    )
+
+    with session_maker() as session:
+        rows = session.scalars(select(SignalEvent).order_by(SignalEvent.date)).all()
+    assert [(r.date.isoformat(), r.signal) for r in rows] == [
+        ("2020-06-01", "golden_cross"),
+        ("2020-09-01", "death_cross"),
+    ]
+    assert rows[1].meta == "v2"
+
+
+def test_save_ticker_info_keeps_known_name(tmp_path):
+    session_maker = init_db(str(tmp_path / "test.db"))
+    save_ticker_info(session_maker, "TEST", "Test Inc.")
+    save_ticker_info(session_maker, "TEST", None)
+
+    with session_maker() as session:
+        rows = session.scalars(select(Ticker)).all()
+    assert [(r.ticker, r.name) for r in rows] == [("TEST", "Test Inc.")]
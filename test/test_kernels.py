@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from src.kernels import crossover_indices, rolling_max, rolling_mean, rolling_means
+
+
+def test_rolling_mean_matches_pandas_with_gaps():
+    close = pd.Series(np.linspace(100.0, 140.0, 300))
+    close.iloc[[5, 120, 121]] = np.nan
+    for window, minp in [(50, 50), (200, 200), (400, 300)]:
+        expected = close.rolling(window=window, min_periods=minp).mean()
+        got = rolling_mean(close.to_numpy(), window, minp)
+        assert np.allclose(got, expected.to_numpy(), equal_nan=True)
+
+
+def test_rolling_means_matches_single_window():
+    close = np.linspace(100.0, 140.0, 300)
+    close[[7, 8]] = np.nan
+    windows = [(50, 50), (200, 200)]
+    for (window, minp), got in zip(windows, rolling_means(close, windows)):
+        assert np.array_equal(got, rolling_mean(close, window, minp), equal_nan=True)
+
+
+def test_rolling_max_matches_pandas():
+    rng = np.random.default_rng(0)
+    close = pd.Series(100 + rng.normal(0, 1, 600).cumsum())
+    close.iloc[[0, 1, 300]] = np.nan
+    for window in (1, 5, 252, 1000):
+        expected = close.rolling(window=window, min_periods=1).max()
+        got = rolling_max(close.to_numpy(), window)
+        assert np.allclose(got, expected.to_numpy(), equal_nan=True)
+
+
+def test_crossover_indices():
+    short = np.array([5.0, 5.0, 5.0, 6.0, 7.0, np.nan, 5.0])
+    long = np.array([5.0, 5.0, 6.0, 6.0, 6.0, 6.0, 6.0])
+    assert crossover_indices(short, long, upward=True).tolist() == [4]
+    # the drop to 5 follows a NaN day, so it is not a cross
+    assert crossover_indices(short, long, upward=False).tolist() == [2]
@@ -0,0 +1,20 @@
+from typer.testing import CliRunner
+
+from src.main import _load_config_or_defaults
+from src.run_many import app as run_many_app
+
+
+def test_empty_config_falls_back_to_defaults(tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text("# nothing configured yet\n", encoding="utf-8")
+    assert _load_config_or_defaults(config) == {}
+
+
+def test_run_many_rejects_invalid_fundamental_quarters(tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text("data_settings:\n  fundamental_quarters: 0\n", encoding="utf-8")
+    args = ["-t", "TEST", "-o", str(tmp_path / "out.jsonl"), "-c", str(config)]
+    args += ["-d", str(tmp_path / "test.db")]
+    result = CliRunner().invoke(run_many_app, args)
+    assert result.exit_code == 1
+    assert result.exception is None or isinstance(result.exception, SystemExit)
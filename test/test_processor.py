@@ -1,4 +1,8 @@
-from src.processor import process_data
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.processor import _fundamental_metrics, process_data
 
 
 def test_sma_calculation(tmp_path, sample_price_df):
@@ -23,3 +27,71 @@ def test_sma_calculation(tmp_path, sample_price_df):
     # numerical checks: last sma_50 close to average of last 50 closes
     last50 = out["close"].tail(50).mean()
     assert abs(out["sma_50"].iloc[-1] - last50) < 1e-6
+
+
+def test_prices_must_be_dataframe(sample_price_df):
+    records = sample_price_df.to_dict("records")
+    with pytest.raises(TypeError):
+        process_data({"ticker": "TEST", "prices": records})
+
+
+def test_tz_aware_dates_keep_local_calendar_day(sample_price_df):
+    prices = sample_price_df.assign(
+        date=pd.date_range(
+            "2020-01-01", periods=len(sample_price_df), tz="Asia/Kolkata"
+        )
+    )
+    out = process_data({"ticker": "TEST", "prices": prices})
+    assert out["date"].dt.tz is None
+    assert out["date"].iloc[0] == pd.Timestamp("2020-01-01")
+
+
+def test_fundamentals_align_to_latest_quarter_on_or_before(sample_price_df):
+    quarters = [
+        {"date": "2020-03-31", "total_equity": 1e9, "shares": 1e7, "close": 1.0},
+        {"date": "2020-06-30", "total_equity": 2e9, "shares": 1e7, "close": 2.0},
+    ]
+    raw = {"prices": sample_price_df, "quarterly_fundamentals": quarters}
+    out = process_data(raw).set_index("date")
+    assert np.isnan(out.loc["2020-03-30", "bvps"])
+    assert out.loc["2020-03-31", "bvps"] == 100.0
+    assert out.loc["2020-06-29", "bvps"] == 100.0
+    assert out.loc["2020-12-31", "bvps"] == 200.0
+    # overlapping names keep the price column and suffix the fundamental one
+    assert out.loc["2020-06-30", "close_fund"] == 2.0
+
+
+def test_metrics_replace_same_named_fundamentals(sample_price_df):
+    quarters = [{"date": "2020-03-31", "ev": -1.0, "bvps": -1.0}]
+    raw = {"prices": sample_price_df, "quarterly_fundamentals": quarters}
+    out = process_data(raw)
+    assert out.columns.is_unique
+    assert out["bvps"].isna().all()
+
+
+def test_enterprise_value_from_info_and_fundamentals(sample_price_df):
+    quarters = [
+        # no cash reported: falls back to info["totalCash"]
+        {"date": "2020-03-31", "total_liabilities": 5e8},
+        {"date": "2020-06-30", "total_liabilities": 6e8, "cash": 1e8},
+    ]
+    raw = {
+        "prices": sample_price_df,
+        "quarterly_fundamentals": quarters,
+        "info": {"marketCap": "2000000000", "totalCash": 3e7},
+    }
+    out = process_data(raw).set_index("date")
+    # before the first quarter: no liabilities, cash from info
+    assert out.loc["2020-03-30", "ev"] == 2e9 - 3e7
+    assert out.loc["2020-03-31", "ev"] == 2e9 + 5e8 - 3e7
+    assert out.loc["2020-12-31", "ev"] == 2e9 + 6e8 - 1e8
+
+
+def test_enterprise_value_without_market_cap_is_nan(sample_price_df):
+    quarters = [{"date": "2020-03-31", "total_liabilities": 5e8, "cash": 1e8}]
+    raw = {"prices": sample_price_df, "quarterly_fundamentals": quarters}
+    assert process_data(raw)["ev"].isna().all()
+
+    metrics = _fundamental_metrics(sample_price_df, np.ones(len(sample_price_df)), {})
+    assert all(np.isnan(metrics[k]) for k in ("bvps", "pb_ratio", "ev"))
+    assert np.ndim(metrics["ev"]) == 0  # scalar, broadcast by the caller
@@ -57,3 +57,15 @@ def test_signal_detection_edge_cases():
     res_dc = detect_death_cross(df)
     assert res_gc == []
     assert res_dc == []
+
+
+def test_tz_aware_dates_keep_local_calendar_day():
+    # midnight in Kolkata is the previous day in UTC
+    df = pd.DataFrame(
+        {
+            "date": pd.date_range("2020-01-01", periods=5, tz="Asia/Kolkata"),
+            "sma_50": [5, 5, 5, 6, 7],
+            "sma_200": [5, 5, 6, 6, 6],
+        }
+    )
+    assert detect_golden_crossover(df) == ["2020-01-05"]